@@ -0,0 +1,292 @@
+# file contains a command-line batch runner for the optimization of cross-sections in function of span and loads
+# (simple beam or continuous beam with n_spans equal spans of the given length)
+# units: [m], [kg], [s], [N], [CHF]
+#
+# usage:
+#   python batch_runner.py scenario_example.json results.jsonl --workers 4
+#   python batch_runner.py scenario_example.json results.csv --workers 8 --dummy-db
+#
+# The scenario file (JSON) contains a list of scenarios. Every scenario is expanded into single cases (one optimization
+# per section type, optimization target, criterion, span and live load). Results are appended to the output file
+# (JSON-lines or CSV, chosen by file extension) as soon as a case is finished. An interrupted batch is resumed by
+# starting the same command again: cases, whose case_id is already found in the output file, are skipped. The case_id
+# contains a hash of the settings of the scenario (database, materials, floor, section geometry, requirements,
+# optimizer), cases of a modified scenario are calculated again.
+# Every optimized section is checked with struct_analysis.evaluate_member for the criterion of its case: sections,
+# which do not fulfill the criterion (e.g. no feasible section within the bounds of the optimizer), are written with
+# status "infeasible", cases with an exception with status "error" (these are calculated again on resume). Optimized
+# sections lie at the limit only up to the convergence of the optimizer, therefore the check admits a relative tolerance
+# (optimizer setting "check_rtol", default 0.1 %).
+# The output file is only appended: a case calculated again after an error has several rows, the last row of a case_id
+# is valid (read_results collapses the rows).
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import create_dummy_database
+import struct_analysis
+import struct_optimization
+
+# default values of a scenario, can be overwritten in the scenario file
+DEFAULT_SCENARIO = {
+    "database": "dummy_sustainability.db",
+    "materials": {"timber": "GL24h", "concrete": "C25/30", "reinforcement": "B500B"},
+    "sections": {"wd_rec": {"b": 1.0, "h": 0.1},
+                 "rc_rec": {"b": 1.0, "h": 0.1, "di_xu": 0.012, "s_xu": 0.15, "di_xo": 0.01, "s_xo": 0.15}},
+    "floors": {},
+    "requirements": {},
+    "loads": {"g2k": 0.75, "qk": 2.0},
+    "lengths": [4, 5, 6, 7, 8, 9, 10, 12],
+    "n_spans": 1,
+    "optimizer": {"max_iter": 100, "check_rtol": 1e-3},
+    "optimizations": [{"section": "wd_rec", "criterion": "ULS"},
+                      {"section": "rc_rec", "to_opt": "GWP", "criterion": "ULS"}],
+}
+
+# columns of the result file (order used for CSV output)
+RESULT_FIELDS = ["case_id", "scenario", "section", "to_opt", "criterion", "n_spans", "l_tot", "g2k", "qk", "h", "di_xu",
+                 "di_xo", "h_tot", "co2", "co2_tot", "cost", "status", "message"]
+
+# per process cache of material objects, avoids repeated database queries for cases of the same scenario
+_material_cache = {}
+
+
+def sql_name(name):
+    # names in the database are compared as SQL string literals, e.g. "'GL24h'"
+    if name.startswith("'") and name.endswith("'"):
+        return name
+    return "'" + name + "'"
+
+
+def load_scenarios(path):
+    # input: path of scenario file
+    # output: list of scenarios, completed with default values
+    with open(path) as file:
+        data = json.load(file)
+    if isinstance(data, dict):
+        data = data.get("scenarios", [data])
+    scenarios = []
+    for i, scenario_in in enumerate(data):
+        scenario = dict(DEFAULT_SCENARIO)
+        scenario.update(scenario_in)
+        scenario.setdefault("name", "scenario_" + str(i))
+        for key in ["materials", "sections", "loads", "optimizer"]:
+            scenario[key] = dict(DEFAULT_SCENARIO[key], **scenario_in.get(key, {}))
+        # geometry of each section is completed with the default geometry of its section type
+        for section, geo in scenario["sections"].items():
+            scenario["sections"][section] = dict(DEFAULT_SCENARIO["sections"].get(section, {}), **geo)
+        scenarios.append(scenario)
+    return scenarios
+
+
+def as_list(value):
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def settings_hash(scenario, section):
+    # output: short hash of the settings of a scenario, which affect the cases of a section type (except span, loads)
+    settings = {key: scenario[key] for key in ["database", "materials", "requirements", "optimizer"]}
+    settings.update({"floor": scenario["floors"][section], "geometry": scenario["sections"][section]})
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:10]
+
+
+def expand_cases(scenarios):
+    # input: list of scenarios
+    # output: list of cases (dicts), each case corresponds to one optimization run
+    cases = []
+    for scenario in scenarios:
+        g2k = scenario["loads"]["g2k"]
+        for opt in scenario["optimizations"]:
+            section = opt["section"]
+            to_opt = opt.get("to_opt", "h")
+            criterion = opt.get("criterion", "ULS")
+            if section not in scenario["floors"]:
+                raise ValueError("scenario " + scenario["name"] + ": no floor structure defined for " + section)
+            n_spans = int(scenario["n_spans"])
+            settings = "cfg=" + settings_hash(scenario, section)
+            for qk in as_list(scenario["loads"]["qk"]):
+                for length in scenario["lengths"]:
+                    case_id = "/".join([scenario["name"], section, to_opt, criterion, "n=" + str(n_spans),
+                                        "l=" + repr(float(length)), "g2k=" + repr(float(g2k)),
+                                        "qk=" + repr(float(qk)), settings])
+                    cases.append({"case_id": case_id, "scenario": scenario, "section": section, "to_opt": to_opt,
+                                  "criterion": criterion, "n_spans": n_spans, "l_tot": float(length),
+                                  "g2k": float(g2k), "qk": float(qk)})
+    return cases
+
+
+def get_materials(scenario):
+    key = (scenario["database"], tuple(sorted(scenario["materials"].items())))
+    if key not in _material_cache:
+        materials = scenario["materials"]
+        _material_cache[key] = struct_analysis.load_design_values(scenario["database"], sql_name(materials["timber"]),
+                                                                  sql_name(materials["concrete"]),
+                                                                  sql_name(materials["reinforcement"]))
+    return _material_cache[key]
+
+
+def check_section(section, system, floorstruc, requirements, case):
+    # output: status and message of the check of the optimized section for the criterion of the case
+    # optimized sections lie at the limit, the check admits the relative tolerance check_rtol of the scenario
+    rtol = case["scenario"]["optimizer"]["check_rtol"]
+    check = struct_analysis.evaluate_member(section, system, floorstruc, requirements, case["g2k"], case["qk"],
+                                            rtol=rtol)
+    if case["criterion"] == "ULS" and not check.uls_ok:
+        return "infeasible", ("qk_zul_gzt = " + repr(check.qk_zul_gzt) + " < qk = " + repr(case["qk"])
+                              + " (rtol = " + repr(rtol) + ")")
+    if case["criterion"] == "SLS1" and not check.sls1_ok:
+        return "infeasible", ("w_install = " + repr(check.w_install) + " (adm. " + repr(check.w_install_adm)
+                              + "), w_use = " + repr(check.w_use) + " (adm. " + repr(check.w_use_adm) + "), w_app = "
+                              + repr(check.w_app) + " (adm. " + repr(check.w_app_adm) + "): admissible deflection "
+                              "exceeded (rtol = " + repr(rtol) + ")")
+    return "ok", ""
+
+
+def run_case(case):
+    # input: case (dict)
+    # output: result (dict) with the optimized cross-section and the status "ok", "infeasible" or "error"
+    scenario = case["scenario"]
+    keys = ["case_id", "section", "to_opt", "criterion", "n_spans", "l_tot", "g2k", "qk"]
+    result = {key: case[key] for key in keys}
+    result["scenario"] = scenario["name"]
+    try:
+        timber, concrete, reinfsteel = get_materials(scenario)
+        layers = [[sql_name(name), h, roh] for name, h, roh in scenario["floors"][case["section"]]]
+        floorstruc = struct_analysis.FloorStruc(layers, scenario["database"])
+        requirements = struct_analysis.Requirements(**scenario["requirements"])
+        if case["n_spans"] == 1:
+            system = struct_analysis.BeamSimpleSup(case["l_tot"])
+        else:
+            system = struct_analysis.BeamContinuous([case["l_tot"]] * case["n_spans"])
+        geo = scenario["sections"][case["section"]]
+        if case["section"] == "wd_rec":
+            section0 = struct_analysis.RectangularWood(timber, geo["b"], geo["h"])
+            member0 = struct_analysis.Member1D(section0, system, floorstruc, requirements, case["g2k"], case["qk"])
+            section = struct_optimization.opt_gzt_wd_rqs(member0, case["criterion"])
+            result.update({"di_xu": "", "di_xo": ""})
+        elif case["section"] == "rc_rec":
+            section0 = struct_analysis.RectangularConcrete(concrete, reinfsteel, geo["b"], geo["h"], geo["di_xu"],
+                                                           geo["s_xu"], geo["di_xo"], geo["s_xo"])
+            member0 = struct_analysis.Member1D(section0, system, floorstruc, requirements, case["g2k"], case["qk"])
+            section = struct_optimization.opt_gzt_rc_rqs(member0, case["to_opt"], case["criterion"],
+                                                         scenario["optimizer"]["max_iter"])
+            result.update({"di_xu": float(section.bw[0][0]), "di_xo": float(section.bw[1][0])})
+        else:
+            raise ValueError("section has to be 'wd_rec' or 'rc_rec'")
+        result.update({"h": float(section.h), "h_tot": float(section.h + floorstruc.h), "co2": float(section.co2),
+                       "co2_tot": float(section.co2 + floorstruc.co2), "cost": float(section.cost)})
+        result["status"], result["message"] = check_section(section, system, floorstruc, requirements, case)
+    except Exception as error:  # a single failing case must not stop the batch
+        result.update({"h": "", "di_xu": "", "di_xo": "", "h_tot": "", "co2": "", "co2_tot": "", "cost": "",
+                       "status": "error", "message": type(error).__name__ + ": " + str(error)})
+    return result
+
+
+def read_results(path):
+    # input: path of output file (JSON-lines or CSV)
+    # output: dict {case_id: row}, the last row of each case_id (e.g. "ok" after an "error" of a previous run)
+    results = {}
+    if not os.path.exists(path):
+        return results
+    with open(path, newline="") as file:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(file)
+        else:
+            rows = []
+            for line in file:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    pass  # incomplete last line of an interrupted run
+        for row in rows:
+            results[row["case_id"]] = row
+    return results
+
+
+class ResultWriter:
+    # appends results to a JSON-lines or CSV file and knows, which cases are already finished
+    def __init__(self, path):
+        self.path = path
+        self.fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+        self.done = self.read_done()
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file and not self.ends_with_newline():
+            with open(path, "a", newline="") as file:
+                file.write("\n")  # terminate incomplete last line of an interrupted run
+        self.file = open(path, "a", newline="")
+        if self.fmt == "csv":
+            self.writer = csv.DictWriter(self.file, fieldnames=RESULT_FIELDS)
+            if new_file:
+                self.writer.writeheader()
+                self.file.flush()
+
+    def ends_with_newline(self):
+        with open(self.path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) == b"\n"
+
+    def read_done(self):
+        # output: set of case_ids of finished cases (status "ok" or "infeasible") in an existing output file
+        results = read_results(self.path)
+        return set(case_id for case_id, row in results.items() if row.get("status") in ("ok", "infeasible"))
+
+    def write(self, result):
+        if self.fmt == "csv":
+            self.writer.writerow(result)
+        else:
+            self.file.write(json.dumps(result) + "\n")
+        self.file.flush()
+        self.done.add(result["case_id"])
+
+    def close(self):
+        self.file.close()
+
+
+def run_batch(cases, output, workers=1):
+    # input: list of cases, path of output file, number of worker processes
+    # output: number of cases calculated in this run
+    writer = ResultWriter(output)
+    todo = [case for case in cases if case["case_id"] not in writer.done]
+    print(str(len(cases) - len(todo)) + " of " + str(len(cases)) + " cases already finished")
+    try:
+        if workers <= 1:
+            for case in todo:
+                writer.write(run_case(case))
+                print("finished: " + case["case_id"])
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(run_case, case) for case in todo]
+                for future in as_completed(futures):
+                    result = future.result()
+                    writer.write(result)
+                    print("finished: " + result["case_id"])
+    finally:
+        writer.close()
+    return len(todo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="optimize cross-sections for all cases of a scenario file")
+    parser.add_argument("scenario_file", help="JSON file with scenarios")
+    parser.add_argument("output", help="result file, *.csv for CSV output, otherwise JSON-lines")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--dummy-db", action="store_true", help="create the dummy database(s) before running")
+    args = parser.parse_args(argv)
+
+    scenarios = load_scenarios(args.scenario_file)
+    if args.dummy_db:
+        for database in set(scenario["database"] for scenario in scenarios):
+            create_dummy_database.create_database(database)
+    cases = expand_cases(scenarios)
+    run_batch(cases, args.output, args.workers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# file contains a local concurrency stress benchmark for the stateless evaluation of members
+# (struct_analysis.evaluate_member with immutable design values)
+#
+# usage:
+#   python bench_concurrency.py --n-eval 20000 --workers 1 2 4 8 --g2k 0.75 --qk 2.0
+#
+# All evaluations of a concurrent run are compared with the results of a sequential run. Threads share the same
+# design value, floor structure and system objects, therefore any shared mutable state would show up as differing
+# results. Note: with the GIL (standard CPython), the throughput of threads is limited to about one core; the process
+# pool shows the scaling over cores, free-threaded Python builds also scale with threads.
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+import create_dummy_database
+import struct_analysis
+
+_shared = {}
+
+
+def init_shared(database, g2k, qk):
+    # create objects and loads, which are shared by all evaluations of one process (read only)
+    timber, concrete, reinfsteel = struct_analysis.load_design_values(database)
+    layers_wd = [["'Parkett 2-Schicht werkversiegelt, 11 mm'", False, False],
+                 ["'Unterlagsboden Zement, 85 mm'", False, False], ["'Glaswolle'", 0.03, False],
+                 ["'Kies gebrochen'", 0.12, False]]
+    layers_rc = layers_wd[:3]
+    _shared.update({"timber": timber, "concrete": concrete, "reinfsteel": reinfsteel,
+                    "floor_wd": struct_analysis.FloorStruc(layers_wd, database),
+                    "floor_rc": struct_analysis.FloorStruc(layers_rc, database),
+                    "requirements": struct_analysis.Requirements(), "g2k": g2k, "qk": qk,
+                    "systems": {length: struct_analysis.BeamSimpleSup(length) for length in range(3, 13)}})
+
+
+def create_cases(n_eval, seed=1):
+    # random candidates: (section type, span, height, rebar diameter)
+    rng = np.random.default_rng(seed)
+    kinds = rng.integers(0, 2, n_eval)
+    lengths = rng.integers(3, 13, n_eval)
+    heights = rng.uniform(0.1, 0.6, n_eval)
+    diameters = rng.uniform(0.006, 0.03, n_eval)
+    return [(int(k), int(l), float(h), float(di)) for k, l, h, di in zip(kinds, lengths, heights, diameters)]
+
+
+def evaluate(case):
+    kind, length, h, di = case
+    system = _shared["systems"][length]
+    if kind == 0:
+        section = struct_analysis.RectangularWood(_shared["timber"], 1.0, h)
+        floorstruc = _shared["floor_wd"]
+    else:
+        section = struct_analysis.RectangularConcrete(_shared["concrete"], _shared["reinfsteel"], 1.0, h, di, 0.15,
+                                                      0.01, 0.15)
+        floorstruc = _shared["floor_rc"]
+    return struct_analysis.evaluate_member(section, system, floorstruc, _shared["requirements"], _shared["g2k"],
+                                           _shared["qk"])
+
+
+def evaluate_chunk(cases):
+    return [evaluate(case) for case in cases]
+
+
+def chunks(cases, n):
+    size = max(1, len(cases) // (4 * n))
+    return [cases[i:i + size] for i in range(0, len(cases), size)]
+
+
+def run(executor_class, workers, cases, database, g2k, qk):
+    # output: results, time [s]
+    start = time.perf_counter()
+    if executor_class is ProcessPoolExecutor:
+        executor = executor_class(max_workers=workers, initializer=init_shared,
+                                  initargs=(database, g2k, qk))
+    else:
+        executor = executor_class(max_workers=workers)
+    with executor:
+        results = [r for chunk in executor.map(evaluate_chunk, chunks(cases, workers)) for r in chunk]
+    return results, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="concurrency stress benchmark for struct_analysis.evaluate_member")
+    parser.add_argument("--n-eval", type=int, default=20000, help="number of evaluations per run")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="numbers of workers")
+    parser.add_argument("--g2k", type=float, default=0.75, help="load of non-structural elements")
+    parser.add_argument("--qk", type=float, default=2.0, help="live load")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "bench.db")
+        create_dummy_database.create_database(database)
+        init_shared(database, args.g2k, args.qk)
+        cases = create_cases(args.n_eval)
+
+        start = time.perf_counter()
+        reference = evaluate_chunk(cases)
+        t_seq = time.perf_counter() - start
+        print("sequential: " + str(args.n_eval) + " evaluations in " + format(t_seq, ".2f") + " s, "
+              + format(args.n_eval / t_seq, ".0f") + " eval/s")
+
+        for executor_class in [ThreadPoolExecutor, ProcessPoolExecutor]:
+            for workers in args.workers:
+                results, t = run(executor_class, workers, cases, database, args.g2k, args.qk)
+                if results != reference:
+                    raise RuntimeError(executor_class.__name__ + " with " + str(workers) + " workers: results differ "
+                                       "from sequential run")
+                print(executor_class.__name__ + ", " + str(workers) + " workers: " + format(t, ".2f") + " s, "
+                      + format(args.n_eval / t, ".0f") + " eval/s, speedup " + format(t_seq / t, ".2f")
+                      + ", results identical")
+
+
+if __name__ == "__main__":
+    main()
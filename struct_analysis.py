@@ -12,41 +12,66 @@
 #
 # Abgebildete Statische Systeme 1D:
 # - Einfacher Balken
+# - Durchlaufträger (Dreimomentengleichung, vektorisiert)
 #
 # Weitere Klassen:
 # - Bauteil 1D
+# - Bemessungswerte der Materialien (unveränderlich) und zustandslose Auswertung von Bauteilen (thread-safe)
 # - Bodenaufbauschicht
 # - Bodenaufbau
 # - Rechteckquerschnitte
 
 import sqlite3  # import modul for SQLite
+from collections import namedtuple
+from contextlib import closing
 import numpy as np
 
 
+# immutable design values of materials, can be shared between threads (see design_values() of material classes)
+WoodDesignValues = namedtuple("WoodDesignValues", ["mech_prop", "fmk", "fvd", "Emmean", "weight", "density", "GWP",
+                                                   "cost", "cost2", "fmd"])
+ConcreteDesignValues = namedtuple("ConcreteDesignValues", ["mech_prop", "fck", "fctm", "Ecm", "weight", "density",
+                                                           "GWP", "cost", "cost2", "fcd", "tcd", "ec2d"])
+SteelDesignValues = namedtuple("SteelDesignValues", ["mech_prop", "fsk", "Es", "density", "GWP", "cost", "fsd"])
+
+
+def query_database(database, inquiry):
+    # execute inquiry on database, connection is closed afterwards
+    with closing(sqlite3.connect(database)) as connection:
+        cursor = connection.cursor()
+        cursor.execute(inquiry)
+        return cursor.fetchall()
+
+
 class Wood:
     # defines properties of wooden material
     def __init__(self, mech_prop, database):  # retrieve basic mechanical data from database
         self.mech_prop = mech_prop
-        connection = sqlite3.connect(database)
-        cursor = connection.cursor()
         # get mechanical properties from database
         inquiry = ("SELECT strength_bend, strength_shea, E_modulus, density_load FROM material_prop WHERE"
                    " name="+mech_prop)
-        cursor.execute(inquiry)
-        result = cursor.fetchall()
+        result = query_database(database, inquiry)
         self.fmk, self.fvd, self.Emmean, self.weight = result[0]
         # get GWP properties from database
         inquiry = "SELECT density, GWP, cost, cost2 FROM products WHERE mech_prop="+mech_prop
-        cursor.execute(inquiry)
-        result = cursor.fetchall()
+        result = query_database(database, inquiry)
         self.density, self.GWP, self.cost, self.cost2 = result[0]
         self.fmd = float()
 
-    def get_design_values(self, gamma_m=1.7, eta_m=1, eta_t=1, eta_w=1):  # calculate design values
+    def calc_design_values(self, gamma_m=1.7, eta_m=1, eta_t=1, eta_w=1):  # calculate design values
         if self.mech_prop[1:3] == "GL":
             gamma_m = 1.5  # SIA 265, 2.2.5: reduzierter Sicherheitsbeiwert für BSH
 
-        self.fmd = self.fmk * eta_m * eta_t * eta_w / gamma_m  # SIA 265, 2.2.2, Formel (3)
+        fmd = self.fmk * eta_m * eta_t * eta_w / gamma_m  # SIA 265, 2.2.2, Formel (3)
+        return fmd
+
+    def get_design_values(self, gamma_m=1.7, eta_m=1, eta_t=1, eta_w=1):  # set design values on material object
+        self.fmd = self.calc_design_values(gamma_m, eta_m, eta_t, eta_w)
+
+    def design_values(self, gamma_m=1.7, eta_m=1, eta_t=1, eta_w=1):  # return immutable design values
+        fmd = self.calc_design_values(gamma_m, eta_m, eta_t, eta_w)
+        return WoodDesignValues(self.mech_prop, self.fmk, self.fvd, self.Emmean, self.weight, self.density, self.GWP,
+                                self.cost, self.cost2, fmd)
 
 
 class ReadyMixedConcrete:
@@ -56,25 +81,30 @@ class ReadyMixedConcrete:
         self.tcd = float()
         self.fcd = float()
         self.mech_prop = mech_prop
-        connection = sqlite3.connect(database)
-        cursor = connection.cursor()
         # get mechanical properties from database
         inquiry = ("SELECT strength_comp, strength_tens, E_modulus, density_load FROM material_prop WHERE name="
                    + mech_prop)
-        cursor.execute(inquiry)
-        result = cursor.fetchall()
+        result = query_database(database, inquiry)
         self.fck, self.fctm, self.Ecm, self.weight = result[0]
         # get GWP properties from database
         inquiry = "SELECT density, GWP, cost, cost2 FROM products WHERE mech_prop="+mech_prop
-        cursor.execute(inquiry)
-        result = cursor.fetchall()
+        result = query_database(database, inquiry)
         self.density, self.GWP, self.cost, self.cost2 = result[0]
 
-    def get_design_values(self, gamma_c=1.5, eta_t=1):  # calculate design values
+    def calc_design_values(self, gamma_c=1.5, eta_t=1):  # calculate design values
         eta_fc = min((30e6/self.fck) ** (1/3), 1)  # SIA 262, 4.2.1.2, Formel (26)
-        self.fcd = self.fck * eta_fc * eta_t / gamma_c  # SIA 262, 2.3.2.3, Formel (2)
-        self.tcd = 0.3 * eta_t * self.fck ** 0.5/gamma_c  # SIA 262, 2.3.2.4, Formel (3)
-        self.ec2d = 0.003  # SIA 262, 4.2.4, Tabelle 8
+        fcd = self.fck * eta_fc * eta_t / gamma_c  # SIA 262, 2.3.2.3, Formel (2)
+        tcd = 0.3 * eta_t * (self.fck/1e6) ** 0.5 * 1e6/gamma_c  # SIA 262, 2.3.2.4, Formel (3), fck in [MPa]
+        ec2d = 0.003  # SIA 262, 4.2.4, Tabelle 8
+        return fcd, tcd, ec2d
+
+    def get_design_values(self, gamma_c=1.5, eta_t=1):  # set design values on material object
+        self.fcd, self.tcd, self.ec2d = self.calc_design_values(gamma_c, eta_t)
+
+    def design_values(self, gamma_c=1.5, eta_t=1):  # return immutable design values
+        fcd, tcd, ec2d = self.calc_design_values(gamma_c, eta_t)
+        return ConcreteDesignValues(self.mech_prop, self.fck, self.fctm, self.Ecm, self.weight, self.density,
+                                    self.GWP, self.cost, self.cost2, fcd, tcd, ec2d)
 
 
 class SteelReinforcingBar:
@@ -82,22 +112,32 @@ class SteelReinforcingBar:
     def __init__(self, mech_prop, database):
         # retrieve basic mechanical data from database (self, table, database name)
         self.mech_prop = mech_prop
-        connection = sqlite3.connect(database)
-        cursor = connection.cursor()
         # get mechanical properties from database
         inquiry = "SELECT strength_tens, E_modulus FROM material_prop WHERE name="+mech_prop
-        cursor.execute(inquiry)
-        result = cursor.fetchall()
+        result = query_database(database, inquiry)
         self.fsk, self.Es = result[0]
         # get GWP properties from database
         inquiry = "SELECT density, GWP, cost FROM products WHERE mech_prop="+mech_prop
-        cursor.execute(inquiry)
-        result = cursor.fetchall()
+        result = query_database(database, inquiry)
         self.density, self.GWP, self.cost = result[0]
         self.fsd = float()
 
-    def get_design_values(self, gamma_s=1.15):  # calculate design values
-        self.fsd = self.fsk/gamma_s  # SIA 262, 2.3.2.5, Formel (4)
+    def calc_design_values(self, gamma_s=1.15):  # calculate design values
+        fsd = self.fsk/gamma_s  # SIA 262, 2.3.2.5, Formel (4)
+        return fsd
+
+    def get_design_values(self, gamma_s=1.15):  # set design values on material object
+        self.fsd = self.calc_design_values(gamma_s)
+
+    def design_values(self, gamma_s=1.15):  # return immutable design values
+        fsd = self.calc_design_values(gamma_s)
+        return SteelDesignValues(self.mech_prop, self.fsk, self.Es, self.density, self.GWP, self.cost, fsd)
+
+
+def load_design_values(database, timber="'GL24h'", concrete="'C25/30'", reinforcement="'B500B'"):
+    # returns immutable design values (default safety factors) of timber, concrete and reinforcement
+    return (Wood(timber, database).design_values(), ReadyMixedConcrete(concrete, database).design_values(),
+            SteelReinforcingBar(reinforcement, database).design_values())
 
 
 # class Section:
@@ -167,33 +207,36 @@ class RectangularWood(SupStrucRectangular):
         self.qs_class_n, self.qs_class_p = [3, 3]     #ReadMe: what is this used for in wood?
         self.g0k = self.calc_weight(wood_type.weight)
         self.ei1 = self.wood_type.Emmean*self.iy  # elastic stiffness wood [Nm^2]
+        self.ei2 = self.ei1  # wooden sections do not crack
+        self.m_cr = float("inf")
         self.co2 = self.a_brutt * self.wood_type.GWP * self.wood_type.density  # [kg_CO2_eq/m]
         self.cost = self.a_brutt * self.wood_type.cost
 
 
 class RectangularConcrete(SupStrucRectangular):
     # defines properties of rectangular, reinforced concrete cross-section
-    def __init__(self, concrete_type, rebar_type, b, h, di_xu, s_xu, di_xo, s_xo, phi=2.0, c_nom=0.03):
-        # create a rectangular concrete object
+    def __init__(self, concrete_type, rebar_type, b, h, di_xu, s_xu, di_xo, s_xo, phi=2.0, c_nom=0.03, asw_s=0.0):
+        # create a rectangular concrete object, asw_s: area of stirrups per length of member [m^2/m]
         super().__init__(b, h, phi)
         self.concrete_type = concrete_type
         self.rebar_type = rebar_type
         self.c_nom = c_nom
         self.bw = [[di_xu, s_xu], [di_xo, s_xo]]
-        # self.bw_bg = XXXXXXXXXXToDoXXXXXXXXXX
+        self.asw_s = asw_s
         [self.d, self.ds] = self.calc_d()
         [self.mu_max, self.x_p, self.as_p, self.qs_class_p] = self.calc_mu('pos')
         [self.mu_min, self.x_n, self.as_n, self.qs_class_n] = self.calc_mu('neg')
-        # [self.vu, self.as_bg] = self.calc_shear_resistance() XXXXXXXXXXToDoXXXXXXXXXX
+        [self.vu, self.as_bg] = self.calc_shear_resistance()
         self.g0k = self.calc_weight(concrete_type.weight)
-        a_s_tot = self.as_p + self.as_n  # add area of stirrups XXXXXXXXXXToDoXXXXXXXXXX
+        a_s_tot = self.as_p + self.as_n + self.as_bg
         co2_rebar = a_s_tot * self.rebar_type.GWP * self.rebar_type.density  # [kg_CO2_eq/m]
         co2_concrete = (self.a_brutt-a_s_tot) * self.concrete_type.GWP * self.concrete_type.density  # [kg_CO2_eq/m]
         self.ei1 = self.concrete_type.Ecm*self.iy  # elastic stiffness concrete (uncracked behaviour) [Nm^2]
+        self.ei2 = self.calc_ei2()  # stiffness of cracked section, positive moment [Nm^2]
+        self.m_cr = self.concrete_type.fctm * self.b * self.h ** 2 / 6  # cracking moment [Nm]
         self.co2 = co2_rebar + co2_concrete
         self.cost = (a_s_tot * self.rebar_type.cost + (self.a_brutt-a_s_tot) * self.concrete_type.cost
                      + self.concrete_type.cost2)
-    #   self.ei2 = # XXXXXXXXXXToDoXXXXXXXXXX
 
     def calc_d(self):
         d = self.h - self.c_nom - self.bw[0][0]/2
@@ -213,6 +256,34 @@ class RectangularConcrete(SupStrucRectangular):
             print("sigen of moment resistance has to be 'neg' or 'pos'")
         return mu, x, a_s, qs_klasse    #ReadMe: ok mit Querschnittsklasse, aber nicht intuitiv mit 1, 2, 99... braucht aus meiner Sicht Erklärung im Code
 
+    def calc_shear_resistance(self):
+        #  out: shear resistance [N], volume of stirrups per length of member [m^3/m]
+        fsd, es = self.rebar_type.fsd, self.rebar_type.Es
+        tcd, fcd = self.concrete_type.tcd, self.concrete_type.fcd
+        vu = np.where(np.asarray(self.asw_s) > 0, calc_vu_stirrups(self.b, self.d, self.asw_s, fsd, fcd),
+                      calc_vu_concrete(self.b, self.d, tcd, fsd, es))
+        as_bg = self.asw_s * (self.h - 2 * self.c_nom)  # length of stirrup legs: h - 2 * c_nom
+        if vu.ndim == 0:
+            return float(vu), as_bg
+        return vu, as_bg
+
+    def calc_asw_erf(self, vd):
+        #  in: design shear force [N]
+        #  out: required area of stirrups per length of member [m^2/m], np.inf if concrete compression fails
+        asw_s = design_stirrups(vd, self.b, self.d, self.concrete_type.tcd, self.concrete_type.fcd,
+                                self.rebar_type.fsd, self.rebar_type.Es)
+        if asw_s.ndim == 0:
+            return float(asw_s)
+        return asw_s
+
+    def calc_ei2(self, sign='pos'):
+        #  out: stiffness of cracked section [Nm^2] (tension reinforcement only, compression reinforcement neglected)
+        if sign == 'pos':
+            a_s, d = self.as_p, self.d
+        else:
+            a_s, d = self.as_n, self.ds
+        return calc_ei2(self.concrete_type.Ecm, self.rebar_type.Es, self.b, d, a_s)
+
     @staticmethod
     def mu_unsigned(di, s, d, b, fsd, fcd):
         # units input: [m, m, m, m, N/m^2, N/m^2]
@@ -228,15 +299,73 @@ class RectangularConcrete(SupStrucRectangular):
             return mu, x, a_s, 99  # Querschnitt hat ungenügendes Verformungsvermögen
 
 
+def calc_vu_concrete(b, d, tcd, fsd, es, d_max=0.032):
+    #  in: width [m], static height [m], tcd [N/m^2], fsd [N/m^2], Es [N/m^2], max. aggregate size [m]
+    #  out: shear resistance of member without stirrups [N], SIA 262, 4.3.3.2.1, (conservative: eps_v = 1.5 fsd/Es)
+    kg = 48 / (16 + d_max * 1e3)  # SIA 262, Formel (40)
+    eps_v = 1.5 * fsd / es  # SIA 262, Formel (41)
+    kd = 1 / (1 + eps_v * np.asarray(d) * 1e3 * kg)  # SIA 262, Formel (39), d in [mm]
+    return kd * tcd * d * b  # SIA 262, Formel (38), d_v = d
+
+
+def calc_vu_stirrups(b, d, asw_s, fsd, fcd, cot_alpha=1.0, kc=0.55):
+    #  in: width [m], static height [m], area of stirrups [m^2/m], fsd [N/m^2], fcd [N/m^2], cot of inclination of
+    #  compression field, reduction factor of concrete strength
+    #  out: shear resistance of member with stirrups [N], SIA 262, 4.3.3.4
+    z = 0.9 * np.asarray(d)
+    v_rd_s = asw_s * z * fsd * cot_alpha  # SIA 262, Formel (43)
+    v_rd_c = b * z * kc * fcd * cot_alpha / (1 + cot_alpha ** 2)  # SIA 262, Formel (44), sin*cos = cot/(1+cot^2)
+    return np.minimum(v_rd_s, v_rd_c)
+
+
+def design_stirrups(vd, b, d, tcd, fcd, fsd, es, cot_alpha=1.0, kc=0.55):
+    #  in: design shear force [N], width [m], static height [m], tcd, fcd, fsd, Es [N/m^2], arrays of any shape
+    #  out: required area of stirrups per length of member [m^2/m], 0 if no stirrups are needed, np.inf if the
+    #  resistance of the concrete compression field is exceeded
+    vd = np.asarray(vd, dtype=float)
+    z = 0.9 * np.asarray(d)
+    asw_s = vd / (z * fsd * cot_alpha)
+    asw_s = np.where(vd <= calc_vu_concrete(b, d, tcd, fsd, es), 0.0, asw_s)
+    v_rd_c = calc_vu_stirrups(b, d, np.inf, fsd, fcd, cot_alpha, kc)
+    return np.where(vd <= v_rd_c, asw_s, np.inf)
+
+
+def calc_qu_shear(vu, alpha_v, li_max):
+    #  in: shear resistance [N], shear coefficient of static system [-], max. span [m], arrays of any shape
+    #  out: max. load in respect to shear resistance [N/m]
+    return vu / (alpha_v * np.asarray(li_max))
+
+
+def calc_cracked_coefficients(n_rho, n_rho2=0.0, delta2=0.0):
+    #  in: n*rho (modular ratio Es/Ec times ratio of tension reinforcement As/(b*d)), n*rho2 and d2/d of compression
+    #  reinforcement, arrays of any shape
+    #  out: relative height of compression zone xi = x/d [-], kappa = I2/(b*d^3) [-] (cracked, linear elastic)
+    n_rho, n_rho2, delta2 = np.broadcast_arrays(np.asarray(n_rho, dtype=float), n_rho2, delta2)
+    n_rho_tot = n_rho + n_rho2
+    xi = -n_rho_tot + np.sqrt(n_rho_tot ** 2 + 2 * (n_rho + n_rho2 * delta2))
+    kappa = xi ** 3 / 3 + n_rho * (1 - xi) ** 2 + n_rho2 * (xi - delta2) ** 2
+    return xi, kappa
+
+
+def calc_ei2(e_c, e_s, b, d, a_s):
+    #  in: E-modulus concrete [N/m^2], E-modulus reinforcement [N/m^2], width [m], static height [m], area of tension
+    #  reinforcement [m^2], arrays of any shape
+    #  out: stiffness of cracked section EI2 [Nm^2], closed-form solution for the neutral axis
+    d = np.asarray(d, dtype=float)
+    n_rho = e_s / e_c * a_s / (b * d)
+    kappa = calc_cracked_coefficients(n_rho)[1]
+    ei2 = e_c * b * d ** 3 * kappa
+    if ei2.ndim == 0:
+        return float(ei2)
+    return ei2
+
+
 class MatLayer:  # create a material layer
     def __init__(self, mat_name, h_input, roh_input, database):  # get initial data from database
         self.name = mat_name
-        connection = sqlite3.connect(database)
-        cursor = connection.cursor()
         # get properties from database
         inquiry = "SELECT h_fix, density, weight, GWP FROM floor_struc_prop WHERE name=" + mat_name
-        cursor.execute(inquiry)
-        result = cursor.fetchall()
+        result = query_database(database, inquiry)
         h_fix, density, weight, self.GWP = result[0]
         if h_input is False:
             self.h = h_fix
@@ -273,6 +402,104 @@ class BeamSimpleSup:
         self.alpha_m = [0, 1/8]
         self.qs_cl_erf = [99, 99]  # Querschnittsklasse: 1 == plast, 99 == keine Anforderung (elast)
         self.alpha_w = 5/384
+        self.alpha_v = 1/2
+        # coefficients for live load (pattern loading), equal to full load for a single span
+        self.alpha_m_q, self.alpha_w_q, self.alpha_v_q = self.alpha_m, self.alpha_w, self.alpha_v
+
+
+class BeamContinuous:
+    # continuous beam over several spans, pinned supports, constant stiffness, uniformly distributed load
+    # moment and deflection coefficients refer to the max. span li_max: m = alpha_m * q * li_max^2,
+    # w = alpha_w * q * li_max^4 / EI, v = alpha_v * q * li_max (same interface as BeamSimpleSup)
+    # alpha_m, alpha_w, alpha_v: full load on all spans (permanent load)
+    # alpha_m_q, alpha_w_q, alpha_v_q: envelope over all load patterns (live load)
+    def __init__(self, spans, pattern_loading=True):
+        self.spans = list(spans)
+        self.l_tot = sum(self.spans)
+        self.li_max = max(self.spans)  # max span (used for calculation of admissible deflections)
+        self.alpha_m, self.alpha_w, self.alpha_v = self.get_coefficients(False)
+        self.alpha_m_q, self.alpha_w_q, self.alpha_v_q = self.get_coefficients(pattern_loading)
+        self.qs_cl_erf = [99, 99]  # elastic analysis of continuous beam: no requirement on cross-section class
+
+    def get_coefficients(self, pattern_loading):
+        alpha_m, alpha_w, alpha_v = calc_coefficients_continuous([self.spans], pattern_loading)
+        # alpha_m = [support (hogging, absolute value), span]
+        return [float(alpha_m[0][0]), float(alpha_m[0][1])], float(alpha_w[0]), float(alpha_v[0])
+
+
+def get_load_patterns(n_spans, pattern_loading=True):
+    #  in: number of spans, consider pattern loading (True) or only full load (False)
+    #  out: array (n_patterns, n_spans) with 1 for loaded and 0 for unloaded spans, all combinations except no load
+    if not pattern_loading:
+        return np.ones((1, n_spans))
+    patterns = (np.arange(1, 2 ** n_spans)[:, None] >> np.arange(n_spans)) & 1
+    return patterns.astype(float)
+
+
+def calc_support_moments(spans, loads):
+    #  in: spans [m] array (n_conf, n_spans), loads [N/m] array (n_conf, n_cases, n_spans) or (n_cases, n_spans)
+    #  out: support moments [Nm] array (n_conf, n_cases, n_spans + 1), hogging moments negative
+    # three-moment equation for each inner support j (span j left, span j+1 right), constant EI:
+    # M_j-1 * l_j + 2 * M_j * (l_j + l_j+1) + M_j+1 * l_j+1 = -(q_j * l_j^3 + q_j+1 * l_j+1^3) / 4
+    spans = np.asarray(spans, dtype=float)
+    loads = np.broadcast_to(np.asarray(loads, dtype=float), (spans.shape[0],) + np.shape(loads)[-2:])
+    n_conf, n_spans = spans.shape
+    m_sup = np.zeros((n_conf, loads.shape[1], n_spans + 1))
+    if n_spans == 1:
+        return m_sup
+    l_left, l_right = spans[:, :-1], spans[:, 1:]
+    a = np.zeros((n_conf, n_spans - 1, n_spans - 1))
+    idx = np.arange(n_spans - 1)
+    a[:, idx, idx] = 2 * (l_left + l_right)
+    a[:, idx[1:], idx[:-1]] = l_left[:, 1:]
+    a[:, idx[:-1], idx[1:]] = l_right[:, :-1]
+    rhs = -(loads[:, :, :-1] * l_left[:, None, :] ** 3 + loads[:, :, 1:] * l_right[:, None, :] ** 3) / 4
+    m_sup[:, :, 1:-1] = np.linalg.solve(a, np.swapaxes(rhs, 1, 2)).swapaxes(1, 2)
+    return m_sup
+
+
+def calc_envelope_continuous(spans, loads, n_points=101):
+    #  in: spans [m] array (n_conf, n_spans), loads [N/m] array (n_conf, n_cases, n_spans) or (n_cases, n_spans)
+    #  out: max. hogging moment (absolute value) [Nm], max. sagging moment [Nm], max. deflection * EI [Nm^3],
+    #  max. shear force [N], arrays (n_conf,), envelope over all load cases
+    spans = np.asarray(spans, dtype=float)
+    m_sup = calc_support_moments(spans, loads)
+    loads = np.broadcast_to(np.asarray(loads, dtype=float), m_sup.shape[:2] + (spans.shape[1],))
+    m_a, m_b = m_sup[:, :, :-1], m_sup[:, :, 1:]  # moments at left and right end of each span
+    l = spans[:, None, :]
+    # max. sagging moment per span, position of zero shear (clipped to span)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.where(loads > 0, np.clip(l / 2 + (m_b - m_a) / (loads * l), 0, l), 0)
+    m_span = loads * x * (l - x) / 2 + m_a * (1 - x / l) + m_b * x / l
+    m_span = np.maximum(m_span, np.maximum(m_a, m_b))
+    # shear forces at the ends of each span
+    v_end = np.maximum(np.abs(loads * l / 2 + (m_b - m_a) / l), np.abs(loads * l / 2 - (m_b - m_a) / l))
+    # deflection on a grid of points per span: simple beam under uniform load plus end moments
+    xi = np.linspace(0, 1, n_points)
+    l4 = l[..., None]
+    x = xi * l4
+    w = (loads[..., None] * x * (l4 ** 3 - 2 * l4 * x ** 2 + x ** 3) / 24
+         + m_a[..., None] * x * (l4 - x) * (2 * l4 - x) / (6 * l4)
+         + m_b[..., None] * x * (l4 ** 2 - x ** 2) / (6 * l4))
+    m_neg = np.max(-m_sup, axis=(1, 2))
+    m_pos = np.max(m_span, axis=(1, 2))
+    w_ei = np.max(w, axis=(1, 2, 3))
+    v_max = np.max(v_end, axis=(1, 2))
+    return np.maximum(m_neg, 0), m_pos, w_ei, v_max
+
+
+def calc_coefficients_continuous(spans, pattern_loading=True, n_points=101):
+    #  in: spans [m] array (n_conf, n_spans) of configurations with equal number of spans, consider pattern loading
+    #  out: alpha_m array (n_conf, 2) [support, span], alpha_w array (n_conf,), alpha_v array (n_conf,), all related to
+    #  q and max. span
+    spans = np.asarray(spans, dtype=float)
+    patterns = get_load_patterns(spans.shape[1], pattern_loading)
+    m_neg, m_pos, w_ei, v_max = calc_envelope_continuous(spans, patterns, n_points)
+    li_max = np.max(spans, axis=1)
+    alpha_m = np.stack([m_neg / li_max ** 2, m_pos / li_max ** 2], axis=1)
+    alpha_w = w_ei / li_max ** 4
+    alpha_v = v_max / li_max
+    return alpha_m, alpha_w, alpha_v
 
 
 class Member1D:
@@ -296,40 +523,79 @@ class Member1D:
         self.qu = self.calc_qu()
         self.qk_zul_gzt = float
 
-        # calculation of deflections (uncracked cross-section, method for cracked cross-section is not implemented jet)
+        # calculation of deflections, effective stiffness for each load combination (cracked concrete sections)
+        # permanent load with coefficients for full load, live load with coefficients for pattern loading
+        q_rare, q_freq, q_per = [self.qk, self.psi[1]*self.qk, self.psi[2]*self.qk]  # live load parts
+        ei_rare, ei_freq, ei_per = [self.calc_ei_eff(self.gk, q) for q in [q_rare, q_freq, q_per]]
+        phi = self.section.phi
         if self.requirements.install == "ductile":
-            self.w_install = self.system.alpha_w * (
-                        self.q_freq + self.q_per * (self.section.phi - 1)) * self.system.l_tot ** 4 / self.section.ei1
+            self.w_install = self.calc_w(self.gk, q_freq, ei_freq) + self.calc_w(self.gk, q_per, ei_per) * (phi - 1)
         elif self.requirements.install == "brittle":
-            self.w_install = self.system.alpha_w * (
-                    self.q_rare + self.q_per * (self.section.phi - 1)) * self.system.l_tot ** 4 / self.section.ei1
-        self.w_use = self.system.alpha_w * (
-                    self.q_freq - self.gk) * self.system.l_tot ** 4 / self.section.ei1
-        self.w_app = self.system.alpha_w * (
-                self.q_per * (1 + self.section.phi)) * self.system.l_tot ** 4 / self.section.ei1
+            self.w_install = self.calc_w(self.gk, q_rare, ei_rare) + self.calc_w(self.gk, q_per, ei_per) * (phi - 1)
+        self.w_use = self.calc_w(0, q_freq, ei_freq)
+        self.w_app = self.calc_w(self.gk, q_per, ei_per) * (1 + phi)
         self.co2 = system.l_tot * (floorstruc.co2 + section.co2)
 
     def calc_qu(self):
-        # calculates maximal load qu in respect to bearing moment mu_max, mu_min and static system
+        # calculates maximal load qu in respect to bearing moment mu_max, mu_min, shear resistance vu and static system
         alpha_m = self.system.alpha_m
         qs_class_erf = self.system.qs_cl_erf  # z.B. [0, 2]
         qs_class_vorh = [self.section.qs_class_n, self.section.qs_class_p]
 
-        if min(alpha_m) == 0:
+        li_max = self.system.li_max
+
+        # alpha_m = [support moment (hogging), span moment (sagging)], both related to max. span li_max
+        # qu_m = [qu in respect to mu_min (support), qu in respect to mu_max (span)], full load on all spans
+        if alpha_m[0] == 0:
             if qs_class_vorh[1] <= qs_class_erf[1]:
-                qu = self.section.mu_max/(max(alpha_m)*self.system.l_tot ** 2)
+                self.qu_m = [np.inf, self.section.mu_max/(alpha_m[1]*li_max ** 2)]
             else:
-                qu = 0
+                self.qu_m = [0, 0]
         else:
-            if qs_class_vorh[0] <= qs_class_erf[0] & qs_class_vorh[1] <= qs_class_erf[1]:
-                qu = min(self.section.mu_max/(max(alpha_m)*self.system.l_tot ** 2), self.section.mu_min /
-                         (min(alpha_m)*self.system.l_tot ** 2))
+            if qs_class_vorh[0] <= qs_class_erf[0] and qs_class_vorh[1] <= qs_class_erf[1]:
+                self.qu_m = [self.section.mu_min/(alpha_m[0]*li_max ** 2), self.section.mu_max/(alpha_m[1]*li_max ** 2)]
             else:
-                qu = 0
-        return qu
+                self.qu_m = [0, 0]
+        self.qu_v = calc_qu_shear(self.section.vu, self.system.alpha_v, li_max)
+        return np.minimum(np.minimum(self.qu_m[0], self.qu_m[1]), self.qu_v)
+
+    def calc_vd(self, gamma_g=1.35, gamma_q=1.5):
+        # design shear force [N]
+        system = self.system
+        return (system.alpha_v * gamma_g * self.gk + system.alpha_v_q * gamma_q * self.qk) * system.li_max
+
+    def calc_w(self, g, q, ei):
+        #  in: permanent load [N/m^2], live load [N/m^2], stiffness [Nm^2]
+        #  out: deflection [m]
+        return (self.system.alpha_w * g + self.system.alpha_w_q * q) * self.system.li_max ** 4 / ei
+
+    def calc_ei_eff(self, g, q, beta=0.5):
+        #  in: permanent load [N/m^2], live load [N/m^2], coefficient for duration of loading beta (0.5: long-term or
+        #  repeated loading)
+        #  out: effective stiffness [Nm^2], interpolation of curvatures between uncracked and cracked state
+        #  works on arrays of candidate sections (zeta = 0: uncracked)
+        m = (self.system.alpha_m[1] * g + self.system.alpha_m_q[1] * q) * self.system.li_max ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.minimum(self.section.m_cr / m, 1)
+        zeta = np.where(m > self.section.m_cr, 1 - beta * ratio ** 2, 0.0)
+        return 1 / (zeta / self.section.ei2 + (1 - zeta) / self.section.ei1)
+
+    def calc_qk_zul(self, gamma_g=1.35, gamma_q=1.5):
+        # admissible live load (ULS), member is not changed
+        # per criterion: gamma_g * gk * alpha + gamma_q * qk * alpha_q <= qu_i * alpha
+        system = self.system
+        qk_zul = [(self.qu_m[1] - gamma_g * self.gk) * system.alpha_m[1] / (gamma_q * system.alpha_m_q[1]),
+                  (self.qu_v - gamma_g * self.gk) * system.alpha_v / (gamma_q * system.alpha_v_q)]
+        if system.alpha_m[0] > 0:
+            qk_zul.append((self.qu_m[0] - gamma_g * self.gk) * system.alpha_m[0] / (gamma_q * system.alpha_m_q[0]))
+        result = qk_zul[0]
+        for qk_zul_i in qk_zul[1:]:
+            result = np.minimum(result, qk_zul_i)
+        return result
 
     def calc_qk_zul_gzt(self, gamma_g=1.35, gamma_q=1.5):
-        self.qk_zul_gzt = (self.qu - gamma_g * self.gk)/gamma_q
+        self.qk_zul_gzt = self.calc_qk_zul(gamma_g, gamma_q)
+        return self.qk_zul_gzt
 
 
 class Requirements:
@@ -338,3 +604,25 @@ class Requirements:
         self.lw_install = lw_install
         self.lw_use = lw_use
         self.lw_app = lw_app
+
+
+# result of evaluate_member, immutable
+MemberResult = namedtuple("MemberResult", ["qu", "qu_v", "qk_zul_gzt", "vd", "w_install", "w_install_adm", "w_use",
+                                           "w_use_adm", "w_app", "w_app_adm", "co2", "uls_ok", "sls1_ok"])
+
+
+def evaluate_member(section, system, floorstruc, requirements, g2k=0.0, qk=2.0, gamma_g=1.35, gamma_q=1.5, rtol=1e-6):
+    # stateless evaluation of a member: the arguments are only read, a new member object is created for every call.
+    # Together with immutable design values (design_values(), load_design_values()) this function can be called
+    # concurrently from a thread pool or an asyncio executor without locking.
+    # The checks admit a relative tolerance rtol, optimized sections lie exactly at the limit (up to round-off).
+    # All values are returned as plain python floats / bools (lists for array valued members), e.g. for json.dumps
+    member = Member1D(section, system, floorstruc, requirements, g2k, qk)
+    qk_zul_gzt = member.calc_qk_zul(gamma_g, gamma_q)
+    uls_ok = qk_zul_gzt >= qk * (1 - rtol)
+    sls1_ok = ((member.w_install <= member.w_install_adm * (1 + rtol)) & (member.w_use <= member.w_use_adm * (1 + rtol))
+               & (member.w_app <= member.w_app_adm * (1 + rtol)))
+    values = [member.qu, member.qu_v, qk_zul_gzt, member.calc_vd(gamma_g, gamma_q), member.w_install,
+              member.w_install_adm, member.w_use, member.w_use_adm, member.w_app, member.w_app_adm, member.co2, uls_ok,
+              sls1_ok]
+    return MemberResult(*[np.asarray(value).tolist() for value in values])
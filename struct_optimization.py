@@ -1,15 +1,42 @@
 #  from scipy.optimize import direct
+import numpy as np
 import struct_analysis
 from scipy.optimize import basinhopping  # import Minimierungsfunktion aus dem SyiPy-Paket
 from scipy.optimize import minimize  # import Minimierungsfunktion aus dem SyiPy-Paket
 
 
+# function for creating reinforced concrete section and member, stirrups are added if required for shear
+# (scalar geometry only, one candidate per call: only the shear functions of struct_analysis are vectorized)
+def rc_member_stirrups(concrete, reinfsteel, b, h, di_xu, s_xu, di_xo, s_xo, system, floorstruc, criteria, g2k, qk):
+    section = struct_analysis.RectangularConcrete(concrete, reinfsteel, b, h, di_xu, s_xu, di_xo, s_xo)
+    member = struct_analysis.Member1D(section, system, floorstruc, criteria, g2k, qk)
+    asw_s = section.calc_asw_erf(member.calc_vd())
+    if 0 < asw_s < np.inf:  # if asw_s == inf, no stirrups are added and qu is limited by the shear resistance
+        section = struct_analysis.RectangularConcrete(concrete, reinfsteel, b, h, di_xu, s_xu, di_xo, s_xo,
+                                                      asw_s=asw_s)
+        member = struct_analysis.Member1D(section, system, floorstruc, criteria, g2k, qk)
+    return section, member
+
+
+# random displacement of basinhopping: the step of each variable is scaled to the range of its bounds (height and
+# rebar diameters differ by two orders of magnitude) and the new point is clipped to the bounds
+class BoundedStep:
+    def __init__(self, bnds, stepsize=0.25, rng=None):
+        self.lower, self.upper = np.array(bnds, dtype=float).T
+        self.stepsize = stepsize  # relative to the range of the bounds, adapted by basinhopping
+        self.rng = np.random.default_rng(rng)
+
+    def __call__(self, x):
+        step = self.rng.uniform(-self.stepsize, self.stepsize, len(x)) * (self.upper - self.lower)
+        return np.clip(x + step, self.lower, self.upper)
+
+
 # function for optimizing reinforced concrete section in terms of GWP or height
 def rc_rqs(var, add_arg):
     # input: variables, which have to be optimized, additional info about cross-section and system, optimizing option
     # output: if criterion == GWP -> co2 of cross-section, punished by delta 10*(qk_zul-qk)
     # output: if criterion == h -> height of cross-section, punished by delta 1*(qk_zul-qk)
-    h, di_xu = var
+    h, di_xu = var[:2]
     system = add_arg[0]
     concrete = add_arg[1]
     reinfsteel = add_arg[2]
@@ -19,15 +46,16 @@ def rc_rqs(var, add_arg):
     criteria = add_arg[8]
     to_opt = add_arg[9]
     criterion = add_arg[10]
+    g2k, qk = add_arg[11:13]
+    if len(var) > 2:  # continuous beams: diameter of support reinforcement is optimized as well
+        di_xo = var[2]
 
-    # create section
-    section = struct_analysis.RectangularConcrete(concrete, reinfsteel, b, h, di_xu, s_xu, di_xo, s_xo)
-
-    # create member
-    member = struct_analysis.Member1D(section, system, floorstruc, criteria, 0.75, 2.0)
+    # create section and member (incl. stirrups)
+    section, member = rc_member_stirrups(concrete, reinfsteel, b, h, di_xu, s_xu, di_xo, s_xo, system, floorstruc,
+                                         criteria, g2k, qk)
     if criterion == "ULS":  # optimize ultimate limit state
         # calculate admissible live load on member
-        member.calc_qk_zul_gzt()  # calculate admissible live load with g2k = 0.75
+        member.calc_qk_zul_gzt()  # calculate admissible live load
         # return co2 rsp. h of cross-section with penalty if q_adm =! q_k
         penalty = member.qk - member.qk_zul_gzt
         if to_opt == "GWP":
@@ -47,7 +75,7 @@ def rc_rqs(var, add_arg):
 
 
 # function for finding optimal geometry (criterion GZT) of rectangular reinforced concrete cross-section
-def opt_gzt_rc_rqs(m, to_opt="GWP", criterion="ULS", max_iter=100):
+def opt_gzt_rc_rqs(m, to_opt="GWP", criterion="ULS", max_iter=100, seed=None):
     # definition of initial values for variables, which are going to be optimized
     h0 = m.section.h  # start value for height corresponds to 1/20 of system length
     di_xu0 = m.section.bw[0][0]  # start value for rebar diameter 40 mm
@@ -56,19 +84,30 @@ def opt_gzt_rc_rqs(m, to_opt="GWP", criterion="ULS", max_iter=100):
     # define bounds of variables
     bnds = [(0.08, 1.0), (0.006, 0.04)]  # height between 10 cm and 2.0 m, diameter of rebars between 6 mm and 40 mm
 
+    # systems with hogging moments (continuous beams): support reinforcement is a design variable as well
+    if m.system.alpha_m[0] > 0:
+        var0.append(m.section.bw[1][0])
+        bnds.append((0.006, 0.04))
+
     # definition of fixed values of cross-section
     b = m.section.b
     s_xu, di_xo, s_xo = m.section.bw[0][1], m.section.bw[1][0], m.section.bw[1][1]
     co, st = m.section.concrete_type, m.section.rebar_type
-    add_arg = [m.system, co, st, b, s_xu, di_xo, s_xo, m.floorstruc, m.requirements, to_opt, criterion]
+    add_arg = [m.system, co, st, b, s_xu, di_xo, s_xo, m.floorstruc, m.requirements, to_opt, criterion, m.g2k,
+               m.qk]
     # # optimize with direct algorithm (weakness: not perfect optimization):
     # opt = direct(rc_rqs_co2, bnds, args=(add_arg,), eps=0.0005, maxfun=None)
-    # optimize with basinghopping algorithm (weakness: bounds are not jet implementet in outer level,
-    # what can lead to warnings):
-    opt = basinhopping(rc_rqs, var0, niter=max_iter, T=1, minimizer_kwargs={"args": (add_arg,), "bounds": bnds,
-                                                                            "method": "Powell"})
-    h, di_xu = opt.x
-    optimized_section = struct_analysis.RectangularConcrete(co, st, b, h, di_xu, s_xu, di_xo, s_xo)
+    # optimize with basinghopping algorithm, steps scaled to and clipped at the bounds (weakness: the result depends
+    # on the random steps, convergence to the limit is not guaranteed for small max_iter; seed: reproducible steps)
+    rng = np.random.default_rng(seed)
+    opt = basinhopping(rc_rqs, np.clip(var0, *np.array(bnds).T), niter=max_iter, T=1,
+                       minimizer_kwargs={"args": (add_arg,), "bounds": bnds, "method": "Powell"},
+                       take_step=BoundedStep(bnds, rng=rng), rng=rng)
+    h, di_xu = opt.x[:2]
+    if len(opt.x) > 2:
+        di_xo = opt.x[2]
+    optimized_section = rc_member_stirrups(co, st, b, h, di_xu, s_xu, di_xo, s_xo, m.system, m.floorstruc,
+                                           m.requirements, m.g2k, m.qk)[0]
     return optimized_section
 
 
@@ -0,0 +1,119 @@
+# file contains code for the adaptive sampling of design curves (optimized cross-section in function of span)
+# units: [m], [kg], [s], [N], [CHF]
+#
+# Instead of optimizing at every point of a fixed list of spans, the span grid is refined only where it is needed:
+# - where h, GWP or cost of an optimized section deviates from the linear prediction of its neighbours
+# - where the governing limit state (ULS / SLS1) or the cross-section class of the concrete section changes
+#
+# example:
+#   member0 = struct_analysis.Member1D(section_rc0, struct_analysis.BeamSimpleSup(4), floorstruc, requirements, g2k, qk)
+#   evaluate = lambda length: opt_design_span(member0, length, "GWP", max_iter=100)
+#   lengths, results = refine_span_grid(evaluate, 4, 12)
+
+from functools import partial
+
+import struct_analysis
+import struct_optimization
+
+
+def create_system(length, n_spans=1):
+    if n_spans == 1:
+        return struct_analysis.BeamSimpleSup(length)
+    return struct_analysis.BeamContinuous([length] * n_spans)
+
+
+def opt_design_span(member0, length, to_opt="GWP", max_iter=100, qk=None, n_spans=1, seed=0, check_rtol=1e-3):
+    # input: initial member (section, floor structure, requirements, loads), span [m], optimization target,
+    # max. iterations of concrete optimization, live load [N/m^2] (None: live load of member0), number of spans,
+    # seed of concrete optimization, relative tolerance of the check of the optimized sections
+    # output: dict with h, co2, cost of the governing section and the governing regime (limit state, section class)
+    # both optimized sections (ULS, SLS1) are checked for both criteria, the governing section is the best (in terms
+    # of to_opt) of the sections, which fulfill both criteria. If none does, the regime is "infeasible".
+    # The optimized sections lie at the limit only up to the convergence of the optimizer (check_rtol). Every span is
+    # optimized with the same seed, the random steps of basinhopping are the same for all points of a curve.
+    if qk is None:
+        qk = member0.qk
+    system = create_system(length, n_spans)
+    member = struct_analysis.Member1D(member0.section, system, member0.floorstruc, member0.requirements, member0.g2k,
+                                      qk)
+    sections = {}
+    for criterion in ["ULS", "SLS1"]:
+        if isinstance(member.section, struct_analysis.RectangularWood):
+            sections[criterion] = struct_optimization.opt_gzt_wd_rqs(member, criterion)
+        else:
+            sections[criterion] = struct_optimization.opt_gzt_rc_rqs(member, to_opt, criterion, max_iter, seed)
+    feasible = []
+    for criterion, section in sections.items():
+        check = struct_analysis.evaluate_member(section, system, member.floorstruc, member.requirements, member.g2k,
+                                                qk, rtol=check_rtol)
+        if check.uls_ok and check.sls1_ok:
+            feasible.append(criterion)
+    if feasible:
+        is_wood = isinstance(member.section, struct_analysis.RectangularWood)
+        objective = "co2" if to_opt == "GWP" and not is_wood else "h"
+        governing = min(feasible, key=lambda criterion: getattr(sections[criterion], objective))
+        regime = governing
+    else:
+        governing = max(sections, key=lambda criterion: sections[criterion].h)
+        regime = "infeasible"
+    section = sections[governing]
+    return {"l": length, "h": float(section.h), "co2": float(section.co2), "cost": float(section.cost),
+            "regime": regime + "/" + str(section.qs_class_p), "feasible": bool(feasible), "section": section}
+
+
+def calc_deviation(xs, ys, j):
+    # relative deviation of point j from the linear interpolation between its neighbours
+    y_lin = ys[j - 1] + (ys[j + 1] - ys[j - 1]) * (xs[j] - xs[j - 1]) / (xs[j + 1] - xs[j - 1])
+    scale = max(abs(ys[j]), abs(y_lin), 1e-12)
+    return abs(ys[j] - y_lin) / scale
+
+
+def refine_span_grid(evaluate, l_min, l_max, n_init=5, keys=("h", "co2", "cost"), rtol=0.02, dl_min=0.25,
+                     max_eval=30, map_function=map):
+    # input: function evaluate(length) -> dict with keys and "regime", span range [m], number of initial points,
+    # values to check, admissible relative deviation from linear prediction, min. distance of points [m],
+    # max. number of evaluations, map function (e.g. executor.map for parallel evaluation of each refinement step)
+    # output: sorted list of spans, list of corresponding results
+    step = (l_max - l_min) / (n_init - 1)
+    lengths = [l_min + i * step for i in range(n_init)]
+    points = dict(zip(lengths, map_function(evaluate, lengths)))
+    while len(points) < max_eval:
+        xs = sorted(points)
+        # indicator of each point: max. relative deviation of all keys from the linear prediction
+        indicator = [0.0] * len(xs)
+        for j in range(1, len(xs) - 1):
+            indicator[j] = max(calc_deviation(xs, [points[x][key] for x in xs], j) for key in keys)
+        # intervals to refine, priority: change of regime, then deviation at the ends of the interval
+        candidates = []
+        for i in range(len(xs) - 1):
+            if xs[i + 1] - xs[i] < 2 * dl_min:
+                continue
+            if points[xs[i]]["regime"] != points[xs[i + 1]]["regime"]:
+                priority = float("inf")
+            else:
+                priority = max(indicator[i], indicator[i + 1])
+            if priority > rtol:
+                candidates.append((priority, (xs[i] + xs[i + 1]) / 2))
+        if not candidates:
+            break
+        candidates.sort(reverse=True)
+        new_lengths = [x for _, x in candidates[:max_eval - len(points)]]
+        points.update(zip(new_lengths, map_function(evaluate, new_lengths)))
+    xs = sorted(points)
+    return xs, [points[x] for x in xs]
+
+
+def design_curves(member0, l_min, l_max, qks=None, to_opt="GWP", max_iter=100, n_spans=1, seed=0, **kwargs):
+    # input: initial member, span range [m], list of live loads [N/m^2] (None: live load of member0), optimization
+    # target, max. iterations of concrete optimization, number of spans, seed of concrete optimization, further
+    # arguments of refine_span_grid (rtol should exceed the scatter of the concrete optimization)
+    # output: dict {qk: (spans, results)}, the span grid is refined independently for each live load
+    if qks is None:
+        qks = [member0.qk]
+    # evaluate is a partial of a module-level function, so it can be passed to a process pool (map_function)
+    curves = {}
+    for qk in qks:
+        evaluate = partial(opt_design_span, member0, to_opt=to_opt, max_iter=max_iter, qk=qk, n_spans=n_spans,
+                           seed=seed)
+        curves[qk] = refine_span_grid(evaluate, l_min, l_max, **kwargs)
+    return curves
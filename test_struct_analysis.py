@@ -0,0 +1,61 @@
+# tests of the static systems (three-moment equation) and the cracked section against closed-form solutions
+# usage: python -m pytest
+
+import numpy as np
+import pytest
+
+import struct_analysis
+
+
+def test_simple_beam():
+    alpha_m, alpha_w, alpha_v = struct_analysis.calc_coefficients_continuous([[5.0]])
+    assert alpha_m[0] == pytest.approx([0, 1 / 8])
+    assert alpha_w[0] == pytest.approx(5 / 384, rel=1e-3)
+    assert alpha_v[0] == pytest.approx(1 / 2)
+
+
+def test_two_equal_spans():
+    system = struct_analysis.BeamContinuous([6.0, 6.0], pattern_loading=False)
+    assert system.alpha_m == pytest.approx([1 / 8, 9 / 128], rel=1e-3)
+    assert system.alpha_w == pytest.approx(1 / 185, rel=3e-3)
+    assert system.alpha_v == pytest.approx(5 / 8)
+
+
+def test_two_equal_spans_pattern_loading():
+    system = struct_analysis.BeamContinuous([6.0, 6.0])
+    assert system.alpha_m_q == pytest.approx([1 / 8, 0.0957], rel=1e-3)
+    # permanent load always acts on all spans
+    assert system.alpha_m == pytest.approx([1 / 8, 9 / 128], rel=1e-3)
+
+
+def test_three_equal_spans():
+    system = struct_analysis.BeamContinuous([5.0, 5.0, 5.0], pattern_loading=False)
+    assert system.alpha_m == pytest.approx([0.1, 0.08], rel=1e-3)
+
+
+def test_support_moment_unequal_spans():
+    # two spans: m_b = -q * (l1^3 + l2^3) / (8 * (l1 + l2))
+    m = struct_analysis.calc_support_moments([[4.0, 6.0]], [[1.0, 1.0]])
+    assert m[0, 0] == pytest.approx([0, -(4 ** 3 + 6 ** 3) / (8 * 10), 0])
+
+
+def test_cracked_coefficients():
+    # tension reinforcement only: xi = -n*rho + sqrt((n*rho)^2 + 2*n*rho), kappa = xi^3/3 + n*rho*(1-xi)^2
+    n_rho = np.array([0.02, 0.05, 0.1])
+    xi, kappa = struct_analysis.calc_cracked_coefficients(n_rho)
+    xi_ref = -n_rho + np.sqrt(n_rho ** 2 + 2 * n_rho)
+    assert xi == pytest.approx(xi_ref)
+    assert xi[2] == pytest.approx(0.35826, rel=1e-4)
+    assert kappa == pytest.approx(xi_ref ** 3 / 3 + n_rho * (1 - xi_ref) ** 2)
+    # compression reinforcement: equilibrium of the first moments of area about the neutral axis
+    xi2, kappa2 = struct_analysis.calc_cracked_coefficients(0.1, 0.05, 0.15)
+    assert xi2 ** 2 / 2 + 0.05 * (xi2 - 0.15) == pytest.approx(0.1 * (1 - xi2))
+    assert xi2 < xi[2]
+
+
+def test_ei2():
+    e_c, e_s, b, d, a_s = 30e9, 205e9, 1.0, 0.2, 1e-3
+    kappa = struct_analysis.calc_cracked_coefficients(e_s / e_c * a_s / (b * d))[1]
+    ei2 = struct_analysis.calc_ei2(e_c, e_s, b, d, a_s)
+    assert isinstance(ei2, float)
+    assert ei2 == pytest.approx(e_c * b * d ** 3 * kappa)